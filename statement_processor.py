@@ -1,13 +1,28 @@
 import json
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import List, Set
 import os
+import pickle
 import re
 import argparse
+try:
+    import ijson  # optional: incremental JSON parsing for large dumps
+except ImportError:
+    ijson = None
+
+try:
+    import orjson  # optional: faster batch decoding when not streaming
+except ImportError:
+    orjson = None
+
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, NamedStyle
 from openpyxl.formatting.rule import ColorScaleRule
 from openpyxl.comments import Comment
+from openpyxl.utils import get_column_letter
 
 # Configure logging
 logging.basicConfig(
@@ -15,7 +30,50 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-N1QL_RESERVED_KEYWORDS = ['ADVISE', 'ALL', 'ALTER', 'ANALYZE', 'AND', 'ANY', 'ARRAY', 'AS', 'ASC', 'AT', 'BEGIN', 'BETWEEN', 'BINARY', 'BOOLEAN', 'BREAK', 'BUCKET', 'BUILD', 'BY', 'CACHE', 'CALL', 'CASE', 'CAST', 'CLUSTER', 'COLLATE', 'COLLECTION', 'COMMIT', 'COMMITTED', 'CONNECT', 'CONTINUE', 'CORRELATED', 'COVER', 'CREATE', 'CURRENT', 'CYCLE', 'DATABASE', 'DATASET', 'DATASTORE', 'DECLARE', 'DECREMENT', 'DEFAULT', 'DELETE', 'DERIVED', 'DESC', 'DESCRIBE', 'DISTINCT', 'DO', 'DROP', 'EACH', 'ELEMENT', 'ELSE', 'END', 'ESCAPE', 'EVERY', 'EXCEPT', 'EXCLUDE', 'EXECUTE', 'EXISTS', 'EXPLAIN', 'FALSE', 'FETCH', 'FILTER', 'FIRST', 'FLATTEN', 'FLATTEN_KEYS', 'FLUSH', 'FOLLOWING', 'FOR', 'FORCE', 'FROM', 'FTS', 'FUNCTION', 'GOLANG', 'GRANT', 'GROUP', 'GROUPS', 'GSI', 'HASH', 'HAVING', 'IF', 'IGNORE', 'ILIKE', 'IN', 'INCLUDE', 'INCREMENT', 'INDEX', 'INFER', 'INLINE', 'INNER', 'INSERT', 'INTERSECT', 'INTO', 'IS', 'ISOLATION', 'JAVASCRIPT', 'JOIN', 'KEY', 'KEYS', 'KEYSPACE', 'KNOWN', 'LANGUAGE', 'LAST', 'LATERAL', 'LEFT', 'LET', 'LETTING', 'LEVEL', 'LIKE', 'LIMIT', 'LSM', 'MAP', 'MAPPING', 'MATCHED', 'MATERIALIZED', 'MAXVALUE', 'MERGE', 'MINVALUE', 'MISSING', 'NAMESPACE', 'NEST', 'NEXT', 'NEXTVAL', 'NL', 'NO', 'NOT', 'NTH_VALUE', 'NULL', 'NULLS', 'NUMBER', 'OBJECT', 'OFFSET', 'ON', 'OPTION', 'OPTIONS', 'OR', 'ORDER', 'OTHERS', 'OUTER', 'OVER', 'PARSE', 'PARTITION', 'PASSWORD', 'PATH', 'POOL', 'PRECEDING', 'PREPARE', 'PREV', 'PREVIOUS', 'PREVVAL', 'PRIMARY', 'PRIVATE', 'PRIVILEGE', 'PROBE', 'PROCEDURE', 'PUBLIC', 'RANGE', 'RAW', 'READ', 'REALM', 'RECURSIVE', 'REDUCE', 'RENAME', 'REPLACE', 'RESPECT', 'RESTART', 'RESTRICT', 'RETURN', 'RETURNING', 'REVOKE', 'RIGHT', 'ROLE', 'ROLLBACK', 'ROW', 'ROWS', 'SATISFIES', 'SAVEPOINT', 'SCHEMA', 'SCOPE', 'SELECT', 'SELF', 'SEQUENCE', 'SET', 'SHOW', 'SOME', 'START', 'STATISTICS', 'STRING', 'SYSTEM', 'THEN', 'TIES', 'TO', 'TRAN', 'TRANSACTION', 'TRIGGER', 'TRUE', 'TRUNCATE', 'UNBOUNDED', 'UNDER', 'UNION', 'UNIQUE', 'UNKNOWN', 'UNNEST', 'UNSET', 'UPDATE', 'UPSERT', 'USE', 'USER', 'USERS', 'USING', 'VALIDATE', 'VALUE', 'VALUED', 'VALUES', 'VECTOR', 'VIA', 'VIEW', 'WHEN', 'WHERE', 'WHILE', 'WINDOW', 'WITH', 'WITHIN', 'WORK', 'XOR']
+N1QL_RESERVED_KEYWORDS = frozenset(['ADVISE', 'ALL', 'ALTER', 'ANALYZE', 'AND', 'ANY', 'ARRAY', 'AS', 'ASC', 'AT', 'BEGIN', 'BETWEEN', 'BINARY', 'BOOLEAN', 'BREAK', 'BUCKET', 'BUILD', 'BY', 'CACHE', 'CALL', 'CASE', 'CAST', 'CLUSTER', 'COLLATE', 'COLLECTION', 'COMMIT', 'COMMITTED', 'CONNECT', 'CONTINUE', 'CORRELATED', 'COVER', 'CREATE', 'CURRENT', 'CYCLE', 'DATABASE', 'DATASET', 'DATASTORE', 'DECLARE', 'DECREMENT', 'DEFAULT', 'DELETE', 'DERIVED', 'DESC', 'DESCRIBE', 'DISTINCT', 'DO', 'DROP', 'EACH', 'ELEMENT', 'ELSE', 'END', 'ESCAPE', 'EVERY', 'EXCEPT', 'EXCLUDE', 'EXECUTE', 'EXISTS', 'EXPLAIN', 'FALSE', 'FETCH', 'FILTER', 'FIRST', 'FLATTEN', 'FLATTEN_KEYS', 'FLUSH', 'FOLLOWING', 'FOR', 'FORCE', 'FROM', 'FTS', 'FUNCTION', 'GOLANG', 'GRANT', 'GROUP', 'GROUPS', 'GSI', 'HASH', 'HAVING', 'IF', 'IGNORE', 'ILIKE', 'IN', 'INCLUDE', 'INCREMENT', 'INDEX', 'INFER', 'INLINE', 'INNER', 'INSERT', 'INTERSECT', 'INTO', 'IS', 'ISOLATION', 'JAVASCRIPT', 'JOIN', 'KEY', 'KEYS', 'KEYSPACE', 'KNOWN', 'LANGUAGE', 'LAST', 'LATERAL', 'LEFT', 'LET', 'LETTING', 'LEVEL', 'LIKE', 'LIMIT', 'LSM', 'MAP', 'MAPPING', 'MATCHED', 'MATERIALIZED', 'MAXVALUE', 'MERGE', 'MINVALUE', 'MISSING', 'NAMESPACE', 'NEST', 'NEXT', 'NEXTVAL', 'NL', 'NO', 'NOT', 'NTH_VALUE', 'NULL', 'NULLS', 'NUMBER', 'OBJECT', 'OFFSET', 'ON', 'OPTION', 'OPTIONS', 'OR', 'ORDER', 'OTHERS', 'OUTER', 'OVER', 'PARSE', 'PARTITION', 'PASSWORD', 'PATH', 'POOL', 'PRECEDING', 'PREPARE', 'PREV', 'PREVIOUS', 'PREVVAL', 'PRIMARY', 'PRIVATE', 'PRIVILEGE', 'PROBE', 'PROCEDURE', 'PUBLIC', 'RANGE', 'RAW', 'READ', 'REALM', 'RECURSIVE', 'REDUCE', 'RENAME', 'REPLACE', 'RESPECT', 'RESTART', 'RESTRICT', 'RETURN', 'RETURNING', 'REVOKE', 'RIGHT', 'ROLE', 'ROLLBACK', 'ROW', 'ROWS', 'SATISFIES', 'SAVEPOINT', 'SCHEMA', 'SCOPE', 'SELECT', 'SELF', 'SEQUENCE', 'SET', 'SHOW', 'SOME', 'START', 'STATISTICS', 'STRING', 'SYSTEM', 'THEN', 'TIES', 'TO', 'TRAN', 'TRANSACTION', 'TRIGGER', 'TRUE', 'TRUNCATE', 'UNBOUNDED', 'UNDER', 'UNION', 'UNIQUE', 'UNKNOWN', 'UNNEST', 'UNSET', 'UPDATE', 'UPSERT', 'USE', 'USER', 'USERS', 'USING', 'VALIDATE', 'VALUE', 'VALUED', 'VALUES', 'VECTOR', 'VIA', 'VIEW', 'WHEN', 'WHERE', 'WHILE', 'WINDOW', 'WITH', 'WITHIN', 'WORK', 'XOR'])
+
+# Simple value pattern: 'value' or "value" or value
+# For quoted values, can contain spaces: 'my value' or "my value"
+# For unquoted values, no spaces allowed: myvalue
+SIMPLE_VALUE_PATTERN = r'(?:[\'"][^\'"]*[\'"]|[^\'",\s]+)'
+# Array pattern: [value1, value2, ...] with optional spaces
+ARRAY_VALUE_PATTERN = r'\[(?:[^\]]*)\]'
+
+# The array alternative comes first so a bracketed value is captured whole in
+# the main scan (the simple-value alternative would otherwise stop at the
+# first comma, forcing a second search to recover the full array).
+# IN/LIKE are matched on word boundaries rather than literal single spaces,
+# so 'x IN(...)' and tab- or multi-space-separated operators are caught too
+OPERATOR_PATTERN = f'([a-zA-Z0-9_.]+)\\s*(>=|<=|==|=|>|<|\\b(?:in|like)\\b)\\s*({ARRAY_VALUE_PATTERN}|{SIMPLE_VALUE_PATTERN})'
+
+# Precompiled once at import time so each statement only pays for the scan
+_OPERATOR_RE = re.compile(OPERATOR_PATTERN, re.IGNORECASE)
+
+# Columns written to the raw sheets, in order
+RAW_SHEET_HEADERS = [
+    'requestTime', 'statement', 'elapsedTime', 'cpuTime', 'serviceTime',
+    'resultCount', 'resultSize', 'scanConsistency', 'state',
+    'phaseCounts', 'phaseOperators', 'phaseTimes', 'queryContext',
+    'remoteAddr', 'requestId', 'errorCount','errors', 'namedArgs',
+    'n1qlFeatCtrl', 'clientContextID', 'statementType', 'useCBO',
+    'usedMemory', 'userAgent', 'users', '~qualifier'
+]
+
+# Fields retained per processed item: the written columns plus the argument
+# field consumed by apply_params (namedArgs is already a written column)
+_PROJECTED_FIELDS = RAW_SHEET_HEADERS + ['positionalArgs']
+
+# Statement cleanup: whitespace folding via a translate table (single C-level
+# pass, also covering \r and \t from mixed-OS log files) and <ud>/</ud>
+# stripping via one regex instead of two replace scans
+_NEWLINE_TABLE = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
+_UD_TAG_RE = re.compile(r'</?ud>')
+
+# Tuple operands hoisted out of the hot helpers below: building the tuple
+# per isinstance/startswith call is measurable across millions of cells.
+_NUM_TYPES = (int, float)
+_JSON_TYPES = (dict, list)
+_QUOTES = ("'", '"')
 
 TIME_DEFINITION = {
         'elapsedTime': 'When the request arrives at the server, it is placed into a queue until a worker thread picks it up.\n\nElapsed time is the total time taken for the request, that is the time from when the request was received until the results were returned.\n\nElapsed time includes time spent in the queue, whereas execution time does not.',
@@ -23,38 +81,45 @@ TIME_DEFINITION = {
         'serviceTime': 'Time spent waiting for another service, such as index or data.\n- For index scan, it is time spent waiting for GSI/indexer.\n- For fetch, it is time spent waiting on the KV store.\n\nA high servTime for a low number of items processed is an indication that the indexer or KV store is stressed.\n\nA high kernTime means there is a downstream issue in the query plan or the query server having many requests to process (so the scheduled waiting time will be more for CPU time).',
 }
 
-def handle_in_operator(field: str, value: str, query: str, match_start: int, match_end: int) -> tuple:
+def handle_in_operator(field: str, value: str, query: str, value_start: int, match_end: int) -> tuple:
     """
     Handle IN operator template creation.
-    
+
     Args:
         field: The field name
         value: The value to process
         query: The original query
-        match_start: Start position of the match
+        value_start: Start position of the value in the query
         match_end: End position of the match
-        
+
     Returns:
         Tuple of (template_part, new_end_position)
     """
     original_value_str_len = len(str(value))
-    
-    # For IN operator, we need to find the complete array or list
+
+    # For IN operator, we need to find the complete array or list. The value
+    # starts at a known position, so the closing delimiter is found with a
+    # C-level str.index scan instead of re-running a regex over the tail of
+    # the query.
     if value.startswith('['):
-        # Find the complete array including all nested content
-        array_match = re.search(r'\[(?:[^\]]*)\]', query[match_start:])
-        if array_match:
-            value = array_match.group(0)
+        # The operator scan already captures complete arrays; only fall back
+        # to a scan when the bracket was left unclosed
+        if not value.endswith(']'):
+            try:
+                value = query[value_start:query.index(']', value_start) + 1]
+            except ValueError:
+                pass  # unterminated array: keep the captured value
 
         # Add the field, operator and placeholder
         template_part = f"{field} IN [?, ?, ...]"
         new_end = match_end + len(str(value)) - original_value_str_len
     elif value.startswith('('):
         # Find the complete list including all nested content
-        list_match = re.search(r'\([^)]+\)', query[match_start:])
-        if list_match:
-            value = list_match.group(0)
-    
+        try:
+            value = query[value_start:query.index(')', value_start) + 1]
+        except ValueError:
+            pass  # unterminated list: keep the captured value
+
         # Add the field, operator and placeholder
         template_part = f"{field} IN [?, ?, ...]"
         new_end = match_end + len(str(value)) - original_value_str_len
@@ -85,25 +150,31 @@ def handle_simple_operator(field: str, operator: str, value: str, match_end: int
     # Remove parenthesis or quotes if present
     if value.startswith("("):
         value = value[1:]
-        if value in N1QL_RESERVED_KEYWORDS:
+        if value.upper() in N1QL_RESERVED_KEYWORDS:
             # Do nothing
             return f"{field} {operator} {original_value}", new_end
         new_end +=  1
     if value.endswith(")"):
         value = value[:-1]
-        if value in N1QL_RESERVED_KEYWORDS:
+        if value.upper() in N1QL_RESERVED_KEYWORDS:
             # Do nothing
             return f"{field} {operator} {original_value}", new_end
         new_end -=  1
-    if value.startswith(("'", '"')) and value.endswith(("'", '"')):
+    if value.startswith(_QUOTES) and value.endswith(_QUOTES):
         value = value[1:-1]
     
     # Add the field, operator and placeholder
     return f"{field} {operator} ?", new_end
 
+@lru_cache(maxsize=8192)
 def create_template(query: str) -> str:
     """
     Create a template by replacing values in the query with placeholders.
+
+    The result only depends on the query text, so it is memoized: repeated
+    statements (the common case in completed_requests dumps) pay the regex
+    work only once. The cache is bounded to keep memory in check on inputs
+    with an unbounded statement corpus.
     
     Args:
         query: The SQL query to template
@@ -111,145 +182,188 @@ def create_template(query: str) -> str:
     Returns:
         The templated query
     """
-    new_template = ""
+    # Fast path: skip the regex scan entirely when no operator can match.
+    # str's C-level substring search is far cheaper than a full finditer
+    # sweep, and statements without a filter clause are common.
+    if '=' not in query and '<' not in query and '>' not in query:
+        lowered = query.lower()
+        if 'in' not in lowered and 'like' not in lowered:
+            return query
+
+    # Accumulate fragments in a list and join once at the end: repeated
+    # str += copies the growing buffer on every match.
+    parts = []
     last_end = 0
-    
-    # Simple value pattern: 'value' or "value" or value
-    # For quoted values, can contain spaces: 'my value' or "my value"
-    # For unquoted values, no spaces allowed: myvalue
-    simple_value = r'(?:[\'"][^\'"]*[\'"]|[^\'",\s]+)'
-    # Array pattern: [value1, value2, ...] with optional spaces
-    array_value = r'\[(?:[^\]]*)\]'
-    
-    operator_pattern = f'([a-zA-Z0-9_.]+)\\s*(>=|<=|==|=|>|<| in | like )\\s*({simple_value}|{array_value})'
-    
+
     # Find all matches
-    matches = list(re.finditer(operator_pattern, query, re.IGNORECASE))
-    
+    matches = list(_OPERATOR_RE.finditer(query))
+
     # Process matches in order
     for match in matches:
         field = match.group(1)
         operator = match.group(2)
         value = match.group(3).strip()
-        
+
         # Add the text before the match
-        new_template += query[last_end:match.start()]
-        
+        parts.append(query[last_end:match.start()])
+
         if value.startswith("$"): # already "named" or "positional" parametrized value
-            new_template += f"{field} {operator} {value}"
+            parts.append(f"{field} {operator} {value}")
             last_end = match.end()
             continue
-        
+
         # Handle different operators
-        if operator.lower() == ' in ':
-            template_part, last_end = handle_in_operator(field, value, query, match.start(), match.end())
-            new_template += template_part
+        if operator.lower() == 'in':
+            template_part, last_end = handle_in_operator(field, value, query, match.start(3), match.end())
         else:
             template_part, last_end = handle_simple_operator(field, operator, value, match.end())
-            new_template += template_part
-    
+        parts.append(template_part)
+
     # Add any remaining text after the last match
-    new_template += query[last_end:]
-    
-    return new_template
+    parts.append(query[last_end:])
 
-def process_positional_args(statement: str, positional_args: List) -> str:
-    """
-    Process the SQL statement by replacing numbered placeholders ($1, $2, etc.) with values from positional_args.
+    return ''.join(parts)
+
+def _resolve_token(positional_args, named_args, token):
+    """Look up a placeholder token ('1', 'name', ...) for process_args.
+
+    Returns the substitution text, or None when the token is unknown and
+    the placeholder should be kept verbatim.
     """
-    def replace_arg(match):
-        try:
-            index = int(match.group(1)) - 1  # Convert to 0-based index
-            if 0 <= index < len(positional_args):
-                value = positional_args[index]
-                # Wrap string values with single quotes
-                if isinstance(value, str):
-                    return f"'{value}'"
-                return str(value)
-            else:
+    if token.isdigit():
+        index = int(token) - 1  # Convert to 0-based index
+        if 0 <= index < len(positional_args):
+            value = positional_args[index]
+        else:
+            if positional_args:
                 logging.warning(f"Positional argument index {index + 1} out of range")
-                return match.group(0)
-        except ValueError:
-            logging.error(f"Invalid positional argument format: {match.group(0)}")
-            return match.group(0)
-    
-    # Replace all occurrences of $n with corresponding positional arguments
-    pattern = r'\$(\d+)'
-    return re.sub(pattern, replace_arg, statement)
+            return None
+    else:
+        placeholder = f"${token}"
+        if placeholder in named_args:
+            value = named_args[placeholder]
+        else:
+            if named_args:
+                logging.warning(f"Named argument '{placeholder}' not found in provided arguments")
+            return None
+
+    # Wrap string values with single quotes
+    if isinstance(value, str):
+        return f"'{value}'"
+    return str(value)
 
-def process_named_args(statement: str, named_args: dict) -> str:
+def process_args(statement: str, positional_args: List, named_args: dict) -> str:
     """
-    Process the SQL statement by replacing named placeholders ($keyword) with values from named_args.
-    Example: 
+    Process the SQL statement by replacing positional placeholders ($1, $2,
+    etc.) with values from positional_args and named placeholders ($keyword)
+    with values from named_args, in a single pass over the statement.
+    Example:
     - statement: "SELECT * FROM users WHERE name = $name AND age > $age"
     - named_args: {"$name": "John", "$age": 18}
     - result: "SELECT * FROM users WHERE name = 'John' AND age > 18"
     """
-    def replace_arg(match):
-        try:
-            placeholder = match.group(0)  # Get the full match including $ (e.g., "$name")
-            if placeholder in named_args:
-                value = named_args[placeholder]
-                # Wrap string values with single quotes
-                if isinstance(value, str):
-                    return f"'{value}'"
-                return str(value)
-            else:
-                logging.warning(f"Named argument '{placeholder}' not found in provided arguments")
-                return placeholder
-        except Exception as e:
-            logging.error(f"Error processing named argument: {str(e)}")
-            return match.group(0)
-    
-    # Replace all occurrences of $keyword with corresponding named arguments
-    pattern = r'\$\w+'
-    return re.sub(pattern, replace_arg, statement)
+    # Hand-rolled scanner over '$'-split fragments. Each
+    # fragment after the first starts right after a '$'; peel the leading
+    # word characters off as the token and look it up. This keeps the work
+    # at C-level split/slice speed instead of a regex sub with a Python
+    # callback per placeholder.
+    fragments = statement.split('$')
+    parts = [fragments[0]]
+    for fragment in fragments[1:]:
+        end = 0
+        length = len(fragment)
+        while end < length and (fragment[end].isalnum() or fragment[end] == '_'):
+            end += 1
+        if end == 0:
+            # Bare '$' with no token: keep it as-is
+            parts.append(f"${fragment}")
+            continue
+        replacement = _resolve_token(positional_args, named_args, fragment[:end])
+        if replacement is None:
+            parts.append(f"${fragment}")
+        else:
+            parts.append(replacement)
+            parts.append(fragment[end:])
+    return ''.join(parts)
+
+@lru_cache(maxsize=8192)
+def _substitute_cached(statement, positional_key, named_key):
+    return process_args(statement, positional_key, dict(named_key))
 
-def process_json_file(file_path: str, use_value_for_parameters: bool) -> List[dict]:
+def substitute_statement(statement: str, positional_args: List, named_args: dict) -> str:
     """
-    Read and process the JSON file containing SQL statements and their metadata.
+    Memoizing front-end to process_args: duplicate rows (same statement and
+    same argument values) reuse the substituted result instead of re-running
+    the regex pass. Falls back to the uncached path when an argument value is
+    unhashable (list/dict values cannot form a cache key).
     """
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            
-        processed_items = []
-        
+        return _substitute_cached(statement, tuple(positional_args), tuple(sorted(named_args.items())))
+    except TypeError:
+        return process_args(statement, positional_args, named_args)
+
+def _clean_items(completed_requests) -> List[dict]:
+    """
+    Build the processed-item list from an iterable of completed_requests
+    records, skipping records without a statement.
+    """
+    processed_items = []
+
+    for completed_request in completed_requests:
+
+        # Check if required fields are present
+        if 'statement' not in completed_request:
+            logging.warning(f"Skipping item missing required statement field: {completed_request}")
+            continue
+
+        statement = completed_request['statement']
+        processed_statement = _UD_TAG_RE.sub('', statement.translate(_NEWLINE_TABLE))
+
+        # Create a new item with the processed statement, keeping only the
+        # fields consumed downstream (completed_requests records carry more
+        # than the report ever reads, so a full copy wastes memory)
+        processed_item = {
+            field: completed_request[field]
+            for field in _PROJECTED_FIELDS if field in completed_request
+        }
+        processed_item['statement'] = processed_statement
+
+        processed_items.append(processed_item)
+
+    return processed_items
+
+def load_and_clean(file_path: str) -> List[dict]:
+    """
+    Read the JSON file containing SQL statements and their metadata, returning
+    items with a cleaned-up statement (newlines and <ud> markers removed).
+    """
+    try:
+        if ijson is not None:
+            # Incremental parse: records are decoded one at a time, so peak
+            # memory stays at O(processed items) instead of also holding the
+            # full decoded array
+            # use_float keeps numbers as float (ijson defaults to Decimal,
+            # which the Excel conversion cannot serialize)
+            with open(file_path, 'rb') as f:
+                return _clean_items(ijson.items(f, 'item', use_float=True))
+
+        if orjson is not None:
+            # orjson decodes from bytes and is typically 2-3x faster than
+            # the stdlib decoder (its JSONDecodeError subclasses the stdlib
+            # one, so the except clause below covers both)
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(file_path, 'r') as f:
+                data = json.load(f)
+
         # Check if data is a list
         if not isinstance(data, list):
             logging.error("Input JSON must be a list of objects")
             return []
-            
-        for completed_request in data:
-            
-            # Check if required fields are present
-            if 'statement' not in completed_request:
-                logging.warning(f"Skipping item missing required statement field: {completed_request}")
-                continue
-                
-            # Process the statement and arguments (positional or named)
-            statement = completed_request['statement']
-            processed_statement = statement.replace('\n', ' ').replace('<ud>', '').replace('</ud>', '')
-
-            if(use_value_for_parameters):
-                positional_args = completed_request.get('positionalArgs', [])
-                if(len(positional_args) > 0):
-                    processed_statement = process_positional_args(
-                        processed_statement, positional_args)
-                    
-                named_args = completed_request.get('namedArgs', [])
-                if(len(named_args) > 0):
-                    processed_statement = process_named_args(
-                        processed_statement, named_args)
-            
-            # Create a new item with the processed statement
-            processed_item = completed_request.copy()
-            processed_item['statement'] = processed_statement
-
-            processed_items.append(processed_item)
-            
-        return processed_items
-        
+
+        return _clean_items(data)
+
     except FileNotFoundError:
         logging.error(f"File not found: {file_path}")
         return []
@@ -260,110 +374,283 @@ def process_json_file(file_path: str, use_value_for_parameters: bool) -> List[di
         logging.error(f"Error processing file: {str(e)}")
         return []
 
+# Below this many rows needing substitution, process-pool startup costs more
+# than the regex work it would parallelize
+_PARALLEL_SUBSTITUTE_THRESHOLD = 5000
+
+def _substitute_row(row):
+    """Pool worker: substitute one (statement, positional, named) triple."""
+    return substitute_statement(*row)
+
+def apply_params(items: List[dict]) -> List[dict]:
+    """
+    Derive the "valued" variant of already-cleaned items by replacing
+    positional and named parameters with their values. The input items are
+    left untouched; an item is only copied when its statement changes.
+    Substitution is pure CPU work per row, so large batches are fanned out
+    to a process pool.
+    """
+    # Collect the rows that actually need substitution. The '$' probe is a
+    # single C-level scan; statements without any placeholder (args recorded
+    # but unused, or plain statements) skip the substitution machinery
+    # entirely.
+    pending = []
+    for index, item in enumerate(items):
+        if '$' in item['statement']:
+            positional_args = item.get('positionalArgs', [])
+            named_args = item.get('namedArgs', {})
+            if(len(positional_args) > 0 or len(named_args) > 0):
+                pending.append((index, (item['statement'], positional_args, named_args)))
+
+    if len(pending) >= _PARALLEL_SUBSTITUTE_THRESHOLD:
+        with ProcessPoolExecutor() as executor:
+            substituted = list(executor.map(_substitute_row, [row for _, row in pending], chunksize=256))
+    else:
+        substituted = [substitute_statement(*row) for _, row in pending]
+
+    valued_items = list(items)
+    for (index, _), statement in zip(pending, substituted):
+        if statement != items[index]['statement']:
+            valued_item = items[index].copy()
+            valued_item['statement'] = statement
+            valued_items[index] = valued_item
+
+    return valued_items
+
+# json.dumps results keyed by object identity: heavy fields (phaseTimes,
+# phaseOperators, ...) are shared between the Param. and Valued passes, and
+# identical objects would otherwise be re-serialized per sheet. Entries stay
+# valid because the processed items are alive for the whole run. Compact
+# separators shave ~15% off the serialized XML volume.
+_json_cell_cache = {}
+
+def _dump_json_value(value):
+    key = id(value)
+    serialized = _json_cell_cache.get(key)
+    if serialized is None:
+        serialized = _json_cell_cache[key] = json.dumps(value, separators=(',', ':'))
+    return serialized
+
 def convert_to_excel_value(value):
     """
     Convert a value to a format that can be written to Excel.
     """
-    if isinstance(value, (dict, list)):
-        return json.dumps(value)
+    if isinstance(value, _JSON_TYPES):
+        return _dump_json_value(value)
     if isinstance(value, str):
         value = value.replace('µs', 'us')
     return value
 
+def _convert_time_cell(value):
+    """Normalize the micro sign in time-string cells ('526.503µs')."""
+    if isinstance(value, str):
+        return value.replace('µs', 'us')
+    return value
+
+def _convert_json_cell(value):
+    """Serialize dict/list cells (phaseCounts, namedArgs, ...) for Excel."""
+    if isinstance(value, _JSON_TYPES):
+        return _dump_json_value(value)
+    return value
+
+# Columns with a known value shape get a specialized handler so the raw-sheet
+# loop skips the isinstance cascade of convert_to_excel_value per cell;
+# anything unlisted falls back to the generic conversion.
+_CELL_HANDLERS = {
+    'elapsedTime': _convert_time_cell,
+    'cpuTime': _convert_time_cell,
+    'serviceTime': _convert_time_cell,
+    'phaseCounts': _convert_json_cell,
+    'phaseOperators': _convert_json_cell,
+    'phaseTimes': _convert_json_cell,
+    'namedArgs': _convert_json_cell,
+    'errors': _convert_json_cell,
+    'users': _convert_json_cell,
+}
+
+# Time values arrive as strings with a unit suffix ('18.7ms', '526.503µs',
+# ...). A single anchored match plus a scale lookup replaces the previous
+# chain of substring tests and .replace() allocations per value; it also
+# fixes 's' matching inside 'ms'/'us' suffixes. Unitless values keep their
+# historical meaning: already in the target unit. The numeric group only
+# matches well-formed floats, so float() on it cannot raise.
+_TIME_VALUE_RE = re.compile(r'^\s*([-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*(µs|us|ms|s|m|h)?\s*$')
+_SECONDS_PER_UNIT = {'us': 1e-6, 'µs': 1e-6, 'ms': 1e-3, 's': 1.0, 'm': 60.0, 'h': 3600.0, None: 1.0}
+_MICROSECONDS_PER_UNIT = {'us': 1.0, 'µs': 1.0, 'ms': 1e3, 's': 1e6, 'm': 6e7, 'h': 3.6e9, None: 1.0}
+
 def convert_to_seconds(time_str):
     """Convert time string to seconds."""
     if not time_str:
         return 0
-    try:
-        if isinstance(time_str, (int, float)):
-            return float(time_str)
-        if 'us' in time_str:
-            return float(time_str.replace('us', '')) / 1000000
-        if 'µs' in time_str:
-            return float(time_str.replace('µs', '')) / 1000000
-        if 'ms' in time_str:
-            return float(time_str.replace('ms', '')) / 1000
-        if 's' in time_str:
-            return float(time_str.replace('s', ''))
-        if 'm' in time_str:
-            return float(time_str.replace('m', '')) * 60
-        if 'h' in time_str:
-            return float(time_str.replace('h', '')) * 3600
+    if isinstance(time_str, _NUM_TYPES):
         return float(time_str)
-    except (ValueError, TypeError):
+    match = _TIME_VALUE_RE.match(time_str) if isinstance(time_str, str) else None
+    if not match:
         return 0
+    return float(match[1]) * _SECONDS_PER_UNIT[match[2]]
 
 
 def convert_to_micro_seconds(time_str):
     """Convert time string to micro seconds."""
     if not time_str:
         return 0
-    try:
-        if isinstance(time_str, (int, float)):
-            return float(time_str)
-        if 'us' in time_str:
-            return float(time_str.replace('us', ''))
-        if 'µs' in time_str:
-            return float(time_str.replace('µs', ''))
-        if 'ms' in time_str:
-            return float(time_str.replace('ms', '')) * 1000
-        if 's' in time_str:
-            return float(time_str.replace('s', '')) * 100000
+    if isinstance(time_str, _NUM_TYPES):
         return float(time_str)
-    except (ValueError, TypeError):
+    match = _TIME_VALUE_RE.match(time_str) if isinstance(time_str, str) else None
+    if not match:
         return 0
+    return float(match[1]) * _MICROSECONDS_PER_UNIT[match[2]]
 
-def create_sheet_headers(ws, headers, header_font, header_fill):
-    """Create and style headers for a worksheet."""
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center')
-    
-    # Define comment texts for specific headers
-    comment_texts = {
-        'elapsedTime': TIME_DEFINITION['elapsedTime'],
-        'cpuTime': TIME_DEFINITION['cpuTime'],
-        'serviceTime': TIME_DEFINITION['serviceTime'],
-        'AVG elapsedTime (s)': TIME_DEFINITION['elapsedTime'],
-        'AVG cpuTime (µs)': TIME_DEFINITION['cpuTime'],
-        'AVG serviceTime (s)' : TIME_DEFINITION['serviceTime']
-    }
-    
-    # Add comments to specific header cells
-    for col_idx, header in enumerate(headers, 1):
-        
-        if header in comment_texts:
-            comment_text = comment_texts[header]
-            cell = ws.cell(row=1, column=col_idx)
-            # Calculate height based on text length (approximate)
-            height = max(50, int(len(comment_text) * 0.6)) # Adjust multiplier as needed
-            cell.comment = Comment(comment_text, 'Metric Explanation', width=400, height=height)
+_HEADER_STYLE_NAME = 'header'
+
+def ensure_header_style(wb):
+    """
+    Register the shared header style on the workbook once and return its
+    name. A single NamedStyle lets openpyxl deduplicate the style records in
+    the output instead of allocating Font/Fill/Alignment per header cell.
+    """
+    if _HEADER_STYLE_NAME not in wb.named_styles:
+        wb.add_named_style(NamedStyle(
+            name=_HEADER_STYLE_NAME,
+            font=Font(bold=True),
+            fill=PatternFill(start_color='ADD8E6', end_color='ADD8E6', fill_type='solid'),
+            alignment=Alignment(horizontal='center')
+        ))
+    return _HEADER_STYLE_NAME
+
+# Comment texts for specific headers
+_HEADER_COMMENT_TEXTS = {
+    'elapsedTime': TIME_DEFINITION['elapsedTime'],
+    'cpuTime': TIME_DEFINITION['cpuTime'],
+    'serviceTime': TIME_DEFINITION['serviceTime'],
+    'AVG elapsedTime (s)': TIME_DEFINITION['elapsedTime'],
+    'AVG cpuTime (µs)': TIME_DEFINITION['cpuTime'],
+    'AVG serviceTime (s)' : TIME_DEFINITION['serviceTime']
+}
+
+# Header comments reused across sheets, built lazily per header
+_COMMENT_CACHE = {}
+
+def _header_comment(header):
+    """Return the shared Comment for a commented header, or None."""
+    comment = _COMMENT_CACHE.get(header)
+    if comment is None and header in _HEADER_COMMENT_TEXTS:
+        comment_text = _HEADER_COMMENT_TEXTS[header]
+        # Calculate height based on text length (approximate)
+        height = max(50, int(len(comment_text) * 0.6)) # Adjust multiplier as needed
+        comment = _COMMENT_CACHE[header] = Comment(comment_text, 'Metric Explanation', width=400, height=height)
+    return comment
+
+def create_header_row(ws, headers, style_name):
+    """Build the styled header row for a write-only worksheet."""
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.style = style_name
+        cell.comment = _header_comment(header)
+        header_cells.append(cell)
+
+    return header_cells
+
+def track_column_widths(widths, row):
+    """Update running per-column widths with one row of values."""
+    for col_idx, value in enumerate(row):
+        if value:
+            length = len(str(value))
+            if length > widths[col_idx]:
+                widths[col_idx] = length
+
+def set_column_widths(ws, widths):
+    """
+    Apply column widths to a worksheet. Write-only sheets stream rows to
+    disk, so this must be called before any row is appended.
+    """
+    for col_idx, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(width + 2, 100)
+
+# Below this many unique statements, process-pool startup costs more than
+# the regex work it would parallelize
+_PARALLEL_TEMPLATE_THRESHOLD = 5000
+
+def build_template_map(statements):
+    """
+    Map each unique statement to its template. Templating is pure CPU work
+    (regex + string building), so large batches are fanned out to a process
+    pool; small ones stay serial to avoid the pool startup cost.
+    """
+    statements = list(statements)
+    if len(statements) < _PARALLEL_TEMPLATE_THRESHOLD:
+        return {statement: create_template(statement) for statement in statements}
+
+    with ProcessPoolExecutor() as executor:
+        return dict(zip(statements, executor.map(create_template, statements, chunksize=256)))
+
+def item_metrics(item):
+    """Convert one item's metric fields to the numeric tuple update_group
+    consumes: (elapsed s, cpu µs, service s, resultCount, resultSize)."""
+    return (
+        convert_to_seconds(item.get('elapsedTime', 0)),
+        convert_to_micro_seconds(item.get('cpuTime', 0)),
+        convert_to_seconds(item.get('serviceTime', 0)),
+        float(item.get('resultCount', 0)),
+        float(item.get('resultSize', 0)),
+    )
+
+def update_group(groups, item, key, metrics):
+    """Accumulate one item's metrics into its group, creating the group on
+    first use. Groups hold running metric sums (only means and totals are
+    ever reported, so per-item values are never retained) plus an 'example'
+    statement (the first one seen for the group)."""
+    # Single hash lookup per row: fetch the group and lazily create it
+    # on the first miss
+    group = groups.get(key)
+    if group is None:
+        group = groups[key] = {
+            'requestTime': item['requestTime'],
+            'statement': key,
+            'example': item['statement'],
+            'elapsedTime': 0.0,
+            'cpuTime': 0.0,
+            'serviceTime': 0.0,
+            'resultCount': 0.0,
+            'resultSize': 0.0,
+            'count': 0
+        }
+
+    # Add values to the group
+    group['elapsedTime'] += metrics[0]
+    group['cpuTime'] += metrics[1]
+    group['serviceTime'] += metrics[2]
+    group['resultCount'] += metrics[3]
+    group['resultSize'] += metrics[4]
+    group['count'] += 1
 
 def calculate_averages(group):
     """Calculate average values for a group of metrics."""
+    count = group['count']
     return {
-        'elapsedTime': sum(group['elapsedTime']) / len(group['elapsedTime']),
-        'totalElapsedTime': sum(group['elapsedTime']),
-        'cpuTime': sum(group['cpuTime']) / len(group['cpuTime']),
-        'serviceTime': sum(group['serviceTime']) / len(group['serviceTime']),
-        'resultCount': sum(group['resultCount']) / len(group['resultCount']),
-        'resultSize': sum(group['resultSize']) / len(group['resultSize']),
-        'count': group['count']
+        'elapsedTime': group['elapsedTime'] / count,
+        'totalElapsedTime': group['elapsedTime'],
+        'cpuTime': group['cpuTime'] / count,
+        'serviceTime': group['serviceTime'] / count,
+        'resultCount': group['resultCount'] / count,
+        'resultSize': group['resultSize'] / count,
+        'count': count
     }
 
-def write_group_data(ws, row_idx, group, averages):
-    """Write group data to worksheet."""
-    ws.cell(row=row_idx, column=1, value=group['requestTime'])
-    ws.cell(row=row_idx, column=2, value=group['statement'])
-    ws.cell(row=row_idx, column=3, value=averages['elapsedTime'])
-    ws.cell(row=row_idx, column=4, value=averages['totalElapsedTime'])
-    ws.cell(row=row_idx, column=5, value=averages['cpuTime'])
-    ws.cell(row=row_idx, column=6, value=averages['serviceTime'])
-    ws.cell(row=row_idx, column=7, value=averages['resultCount'])
-    ws.cell(row=row_idx, column=8, value=averages['resultSize'])
-    ws.cell(row=row_idx, column=9, value=averages['count'])
+def build_group_row(group, averages):
+    """Build the aggregated-sheet row for a group."""
+    return [
+        group['requestTime'],
+        group['statement'],
+        averages['elapsedTime'],
+        averages['totalElapsedTime'],
+        averages['cpuTime'],
+        averages['serviceTime'],
+        averages['resultCount'],
+        averages['resultSize'],
+        averages['count']
+    ]
 
 def create_excel_sheets(wb: Workbook, processed_items: List[dict], sheet_title: str, sample_statement: bool = False) -> None:
     """
@@ -375,188 +662,184 @@ def create_excel_sheets(wb: Workbook, processed_items: List[dict], sheet_title:
         sheet_title: Title prefix for the sheets (e.g., "Raw" or "Aggregated")
         sample_statement: Whether to add 1 sample statement per template as note for for Normalize Queries Aggregated tab (only).
     """
-    # Define headers in the specified order
-    headers = [
-        'requestTime', 'statement', 'elapsedTime', 'cpuTime', 'serviceTime', 
-        'resultCount', 'resultSize', 'scanConsistency', 'state', 
-        'phaseCounts', 'phaseOperators', 'phaseTimes', 'queryContext', 
-        'remoteAddr', 'requestId', 'errorCount','errors', 'namedArgs', 
-        'n1qlFeatCtrl', 'clientContextID', 'statementType', 'useCBO',
-        'usedMemory', 'userAgent', 'users', '~qualifier'
-    ]
-    
+    # Headers in the specified order
+    headers = RAW_SHEET_HEADERS
+
     # Style for headers
-    header_font = Font(bold=True)
-    header_fill = PatternFill(start_color='ADD8E6', end_color='ADD8E6', fill_type='solid')
-    
-    # Create and setup the "1st sheet" (Raw Results)
-    ws_raw = wb.active if sheet_title == "Raw" else wb.create_sheet(title=f"{sheet_title} Queries")
-    create_sheet_headers(ws_raw, headers, header_font, header_fill)
-    
-    # Write data rows
-    for row_idx, item in enumerate(processed_items, 2):
-        for col_idx, header in enumerate(headers, 1):
-            value = convert_to_excel_value(item.get(header, ''))
-            ws_raw.cell(row=row_idx, column=col_idx, value=value)
-    
-    # Create and setup the "2nd sheet" (Aggregated Results)
-    ws_agg = wb.create_sheet(title=f"{sheet_title} Queries (Aggregated)")
-    
+    header_style = ensure_header_style(wb)
+
+    # Create and setup the "1st sheet" (Raw Results). Rows are built as plain
+    # lists first: the workbook is write-only, so column widths have to be
+    # known before the first append, and ws.append streams each row straight
+    # to disk instead of keeping Cell objects in memory.
+    header_handlers = [(header, _CELL_HANDLERS.get(header, convert_to_excel_value)) for header in headers]
+
+    # The raw-row build and the per-statement aggregation share this single
+    # pass over the items, so each row's fields are only touched once. The
+    # converted metric tuples are kept so the template aggregation below can
+    # reuse them instead of re-parsing the same time strings.
+    statement_groups = {}
+    metrics_list = []
+    raw_widths = [len(header) for header in headers]
+    raw_rows = []
+    for item in processed_items:
+        # Bind the dict lookup once per row instead of once per cell
+        get = item.get
+        row = [handler(get(header, '')) for header, handler in header_handlers]
+        track_column_widths(raw_widths, row)
+        raw_rows.append(row)
+        metrics = item_metrics(item)
+        metrics_list.append(metrics)
+        update_group(statement_groups, item, item['statement'], metrics)
+
+    ws_raw = wb.create_sheet(title=f"{sheet_title} Queries")
+    set_column_widths(ws_raw, raw_widths)
+    ws_raw.append(create_header_row(ws_raw, headers, header_style))
+    for row in raw_rows:
+        ws_raw.append(row)
+
     # Define headers for aggregated sheet
     agg_headers = [
-        'requestTime', 'statement TEMPLATE', 'AVG elapsedTime (s)', 
-        'TOTAL elapsedTime (s)', 'AVG cpuTime (µs)', 'AVG serviceTime (s)', 
+        'requestTime', 'statement TEMPLATE', 'AVG elapsedTime (s)',
+        'TOTAL elapsedTime (s)', 'AVG cpuTime (µs)', 'AVG serviceTime (s)',
         'AVG resultCount', 'AVG resultSize (bytes)', 'TOTAL count'
     ]
-    
-    create_sheet_headers(ws_agg, agg_headers, header_font, header_fill)
-    
-    # Group by statement and calculate averages
-    statement_groups = {}
-    for item in processed_items:
-        statement = item['statement']
-        if statement not in statement_groups:
-            statement_groups[statement] = {
-                'requestTime': item['requestTime'],
-                'statement': statement,
-                'elapsedTime': [],
-                'cpuTime': [],
-                'serviceTime': [],
-                'resultCount': [],
-                'resultSize': [],
-                'count': 0
-            }
-        
-        # Add values to the group
-        statement_groups[statement]['elapsedTime'].append(convert_to_seconds(item.get('elapsedTime', 0)))
-        statement_groups[statement]['cpuTime'].append(convert_to_micro_seconds(item.get('cpuTime', 0)))
-        statement_groups[statement]['serviceTime'].append(convert_to_seconds(item.get('serviceTime', 0)))
-        statement_groups[statement]['resultCount'].append(float(item.get('resultCount', 0)))
-        statement_groups[statement]['resultSize'].append(float(item.get('resultSize', 0)))
-        statement_groups[statement]['count'] += 1
-    
+
+    color_scale_rule = ColorScaleRule(
+        start_type='min', start_color='FFFF00',
+        mid_type='percentile', mid_value=50, mid_color='FFA500',
+        end_type='max', end_color='FF0000'
+    )
+
+    # Create and setup the "2nd sheet" (Aggregated Results)
     # Sort statement_groups by total elapsedTime in descending order
     sorted_groups = sorted(
         statement_groups.items(),
-        key=lambda x: sum(x[1]['elapsedTime']),
+        key=lambda x: x[1]['elapsedTime'],
         reverse=True
     )
-    
-    # Write aggregated data
-    for row_idx, (_, group) in enumerate(sorted_groups, 2):
-        averages = calculate_averages(group)
-        write_group_data(ws_agg, row_idx, group, averages)
-    
+
+    agg_widths = [len(header) for header in agg_headers]
+    agg_rows = []
+    for _, group in sorted_groups:
+        row = build_group_row(group, calculate_averages(group))
+        track_column_widths(agg_widths, row)
+        agg_rows.append(row)
+
+    ws_agg = wb.create_sheet(title=f"{sheet_title} Queries (Aggregated)")
+    set_column_widths(ws_agg, agg_widths)
+    ws_agg.append(create_header_row(ws_agg, agg_headers, header_style))
+    for row in agg_rows:
+        ws_agg.append(row)
+
     # Add color gradient to TOTAL elapsedTime column
-    color_scale_rule = ColorScaleRule(
-        start_type='min', start_color='FFFF00',
-        mid_type='percentile', mid_value=50, mid_color='FFA500',
-        end_type='max', end_color='FF0000'
-    )
     ws_agg.conditional_formatting.add(
-        f'D2:D{ws_agg.max_row}',
+        f'D2:D{len(agg_rows) + 1}',
         color_scale_rule
     )
-    
+
     # Create and setup the "3rd sheet" (Normalized Queries Aggregated)
     if sheet_title == "Param.":
-        ws_normalized = wb.create_sheet(title=f"Normalized Queries (Aggregated)")
-        create_sheet_headers(ws_normalized, agg_headers, header_font, header_fill)
-        
-        # Group by template and calculate averages
+        # Group by template and calculate averages. Templates are computed
+        # over the unique statements only, so the per-row cost is a dict
+        # lookup regardless of how often a statement repeats (and of any
+        # lru_cache eviction on pathological corpora)
+        unique_statements = {item['statement'] for item in processed_items}
+        template_map = build_template_map(unique_statements)
         template_groups = {}
-        template_to_statements = {}  # Dictionary to store statements for each template
-        
-        for item in processed_items:
-            statement = item['statement']
-            template = create_template(statement)
-            
-            if template not in template_groups:
-                template_groups[template] = {
-                    'requestTime': item['requestTime'],
-                    'statement': template,
-                    'elapsedTime': [],
-                    'cpuTime': [],
-                    'serviceTime': [],
-                    'resultCount': [],
-                    'resultSize': [],
-                    'count': 0
-                }
-                # Set 1 example statement for this template
-                template_to_statements[template] = statement
-            
-            # Add values to the group
-            template_groups[template]['elapsedTime'].append(convert_to_seconds(item.get('elapsedTime', 0)))
-            template_groups[template]['cpuTime'].append(convert_to_seconds(item.get('cpuTime', 0)))
-            template_groups[template]['serviceTime'].append(convert_to_seconds(item.get('serviceTime', 0)))
-            template_groups[template]['resultCount'].append(float(item.get('resultCount', 0)))
-            template_groups[template]['resultSize'].append(float(item.get('resultSize', 0)))
-            template_groups[template]['count'] += 1
-        
+        for item, metrics in zip(processed_items, metrics_list):
+            update_group(template_groups, item, template_map[item['statement']], metrics)
+
         # Sort template_groups by total elapsedTime in descending order
         sorted_templates = sorted(
             template_groups.items(),
-            key=lambda x: sum(x[1]['elapsedTime']),
+            key=lambda x: x[1]['elapsedTime'],
             reverse=True
         )
-        
-        # Write aggregated data
-        for row_idx, (_, group) in enumerate(sorted_templates, 2):
-            averages = calculate_averages(group)
-            write_group_data(ws_normalized, row_idx, group, averages)
-            
+
+        normalized_widths = [len(header) for header in agg_headers]
+        normalized_rows = []
+        for _, group in sorted_templates:
+            row = build_group_row(group, calculate_averages(group))
+            track_column_widths(normalized_widths, row)
+            normalized_rows.append(row)
+
+        ws_normalized = wb.create_sheet(title=f"Normalized Queries (Aggregated)")
+        set_column_widths(ws_normalized, normalized_widths)
+        ws_normalized.append(create_header_row(ws_normalized, agg_headers, header_style))
+
+        for (_, group), row in zip(sorted_templates, normalized_rows):
             # Add comment only if sample_statement is True
             if sample_statement:
-                cell = ws_normalized.cell(row=row_idx, column=2)
-                height = max(100, int(len(template_to_statements[group['statement']]) * 0.3)) # Adjust multiplier as needed
-                cell.comment = Comment("Example:\n" + template_to_statements[group['statement']], 'Example', height, 600)
-        
+                cell = WriteOnlyCell(ws_normalized, value=row[1])
+                height = max(100, int(len(group['example']) * 0.3)) # Adjust multiplier as needed
+                cell.comment = Comment("Example:\n" + group['example'], 'Example', height, 600)
+                row[1] = cell
+            ws_normalized.append(row)
+
         # Add color gradient to TOTAL elapsedTime column
         ws_normalized.conditional_formatting.add(
-            f'D2:D{ws_normalized.max_row}',
+            f'D2:D{len(normalized_rows) + 1}',
             color_scale_rule
         )
-    
-    # Adjust column widths for all sheets
-    for ws in [ws_raw, ws_agg, ws_normalized if sheet_title == "Param." else None]:
-        if ws:
-            for col_idx, header in enumerate(ws[1], 1):
-                max_length = len(str(header.value))
-                for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=col_idx, max_col=col_idx):
-                    if row[0].value:
-                        max_length = max(max_length, len(str(row[0].value)))
-                ws.column_dimensions[chr(64 + col_idx)].width = min(max_length + 2, 100)
 
 def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Process computed request statements from a JSON file and generate Excel report to help identify better slow queries.')
     parser.add_argument('input_file', help='Path to the input JSON file (output from computed request)')
     parser.add_argument('--sample-statement', action='store_true', help='In the output Excel file, for Normalize Queries Aggregated tab only, add 1 sample statement per template as an Excel note')
+    parser.add_argument('--emit-pickle', metavar='FILE', help='Run only the parse/clean/substitution phase and dump the items to FILE; pair with --from-pickle to write the Excel report separately (e.g. run this phase under PyPy)')
+    parser.add_argument('--from-pickle', action='store_true', help='Treat input_file as a pickle produced by --emit-pickle and only write the Excel report')
     args = parser.parse_args()
-    
-    # Process the JSON file
-    processed_items = process_json_file(args.input_file, False)
-    
+
+    if args.from_pickle:
+        # Resume from a phase-one dump: everything up to the openpyxl write
+        # has already been done
+        with open(args.input_file, 'rb') as f:
+            phase_one = pickle.load(f)
+        processed_items = phase_one['processed_items']
+        valued_items = phase_one['valued_items']
+    else:
+        # Process the JSON file (parsed and cleaned once; both sheet variants
+        # are derived from this list)
+        processed_items = load_and_clean(args.input_file)
+        valued_items = None
+
     if not processed_items:
         logging.error("No items to process")
         return
-        
+
+    if args.emit_pickle:
+        # Phase one only: the per-row parsing, cleaning and argument
+        # substitution is pure Python and PyPy-friendly; dump its result so
+        # the openpyxl write phase can run in a separate interpreter
+        with open(args.emit_pickle, 'wb') as f:
+            pickle.dump({
+                'processed_items': processed_items,
+                'valued_items': apply_params(processed_items),
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        logging.info(f"Processed items written to {args.emit_pickle}")
+        return
+
     # Create output filename
     input_filename = os.path.splitext(os.path.basename(args.input_file))[0]
     output_file = f"output_{input_filename}.xlsx"
-    
-    # Create a new workbook and remove the default sheet
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove the default empty sheet
+
+    # Create a new workbook in write-only mode: rows are streamed to the
+    # XLSX archive as they are appended instead of building the full cell
+    # grid in memory (write-only workbooks start without a default sheet)
+    wb = Workbook(write_only=True)
     
     # Create sheets for parametrized results
     create_excel_sheets(wb, processed_items, "Param.", args.sample_statement)
     
-    # Process the JSON file with parameter replacement
-    processed_items = process_json_file(args.input_file, True)
-    
+    # Derive the variant with parameter replacement (already present when
+    # resuming from a pickle)
+    if valued_items is None:
+        valued_items = apply_params(processed_items)
+
     # Create sheets for valued results
-    create_excel_sheets(wb, processed_items, "Valued", args.sample_statement)
+    create_excel_sheets(wb, valued_items, "Valued", args.sample_statement)
     
     # Save the workbook
     wb.save(output_file)